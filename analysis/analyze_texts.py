@@ -3,16 +3,73 @@ Comprehensive text analysis for Nietzsche corpus.
 Performs bag-of-words, sentiment analysis, style metrics, n-grams, and concept extraction.
 """
 
+import multiprocessing
 import re
+import signal
 import string
-from collections import Counter
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
 import statistics
+import numpy as np
 import nltk
-from nltk.tokenize import word_tokenize, sent_tokenize
 from nltk.corpus import stopwords
-from nltk.util import ngrams as nltk_ngrams
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import textstat
+import pyphen
+
+from preprocess import tokenize_text, encode_words
+
+
+# Key Nietzschean concepts with variations
+KEY_CONCEPTS = {
+    "will to power": [r'\bwill[- ]to[- ]power\b', r'\bwill-to-power\b'],
+    "übermensch": [r'\b[uü]bermensch\b', r'\boverman\b', r'\bsuperman\b'],
+    "eternal recurrence": [r'\beternal\s+recurrence\b', r'\beternal\s+return\b'],
+    "master morality": [r'\bmaster\s+morality\b', r'\bmaster-morality\b'],
+    "slave morality": [r'\bslave\s+morality\b', r'\bslave-morality\b'],
+    "ressentiment": [r'\bressentiment\b', r'\bresentment\b'],
+    "nihilism": [r'\bnihilism\b', r'\bnihilist\b'],
+    "genealogy": [r'\bgenealogy\b', r'\bgeneaological\b'],
+    "perspectivism": [r'\bperspectiv\w*\b'],
+    "dionysian": [r'\bdionysian\b', r'\bdionysos\b'],
+    "apollonian": [r'\bapollonian\b', r'\bapollo\b'],
+    "god is dead": [r'\bgod\s+is\s+dead\b'],
+    "amor fati": [r'\bamor\s+fati\b']
+}
+
+
+def _build_concept_regex(concepts):
+    """Fuse all concept patterns into one alternation of named groups."""
+    alternatives = []
+    group_to_concept = {}
+    for concept, patterns in concepts.items():
+        for pattern in patterns:
+            group = f"g{len(alternatives)}"
+            alternatives.append(f"(?P<{group}>{pattern})")
+            group_to_concept[group] = concept
+    return re.compile("|".join(alternatives), re.IGNORECASE), group_to_concept
+
+
+_CONCEPT_RE, _GROUP_TO_CONCEPT = _build_concept_regex(KEY_CONCEPTS)
+
+# Emoji and pictographic symbols, which trigger slow paths in VADER
+_EMOJI_RE = re.compile('[\U0001F000-\U0001FAFF\u2600-\u27BF\uFE0F]+')
+
+# Runs of five or more identical marks; VADER's emphasis boost caps at four
+_PUNCT_RUN_RE = re.compile(r'([!?.\-—])\1{4,}')
+
+# Seconds to wait for a single chunk before dropping it from the average
+SENTIMENT_CHUNK_TIMEOUT = 60
+
+# Chunk scores memoized in the calling process, most recently used last, so a
+# cache hit never reaches a pool worker
+_CHUNK_SCORE_CACHE = OrderedDict()
+CHUNK_SCORE_CACHE_SIZE = 4096
+
+# Sentiment pool reused by every analyze_sentiment call in this process; it is
+# only replaced after a chunk times out
+_SENTIMENT_POOL = None
+_SENTIMENT_POOL_WORKERS = 0
 
 
 def ensure_nltk_data():
@@ -30,26 +87,33 @@ def ensure_nltk_data():
         nltk.download('stopwords', quiet=True)
 
 
-def analyze_bag_of_words(text, top_n=100):
+@lru_cache(maxsize=None)
+def get_stop_words():
+    """Return the English stopword set, loaded once per process."""
+    return frozenset(stopwords.words('english'))
+
+
+@lru_cache(maxsize=None)
+def get_sentiment_analyzer():
+    """Return a shared VADER analyzer so the lexicon is only parsed once."""
+    return SentimentIntensityAnalyzer()
+
+
+def analyze_bag_of_words(words_alpha, stop_words, top_n=100):
     """
     Create bag of words with stopwords removed.
 
     Args:
-        text: Input text
+        words_alpha: Lowercased alphabetic word tokens
+        stop_words: Set of stopwords to exclude
         top_n: Number of top words to return
 
     Returns:
         Dictionary with word frequencies
     """
-    # Tokenize
-    words = word_tokenize(text.lower())
-
-    # Remove stopwords and punctuation
-    stop_words = set(stopwords.words('english'))
-    words = [w for w in words if w.isalpha() and w not in stop_words and len(w) > 2]
-
-    # Count frequencies
-    word_freq = Counter(words)
+    # Count frequencies, removing stopwords and short words on the fly so no
+    # intermediate filtered list is built
+    word_freq = Counter(w for w in words_alpha if w not in stop_words and len(w) > 2)
 
     # Get top N words
     top_words = [{"word": word, "count": count} for word, count in word_freq.most_common(top_n)]
@@ -57,39 +121,195 @@ def analyze_bag_of_words(text, top_n=100):
     return {
         "top_100": top_words,
         "total_vocabulary": len(word_freq),
-        "total_words_analyzed": len(words)
+        "total_words_analyzed": sum(word_freq.values())
     }
 
 
-def analyze_sentiment(text):
+def _normalize_for_vader(chunk):
+    """Strip emoji and shorten long punctuation runs before VADER scoring."""
+    chunk = _EMOJI_RE.sub(' ', chunk)
+    return _PUNCT_RUN_RE.sub(r'\1\1\1\1', chunk)
+
+
+def _score_chunk(chunk):
+    """Score one chunk of text with the process-local VADER analyzer."""
+    return get_sentiment_analyzer().polarity_scores(_normalize_for_vader(chunk))
+
+
+def _remember_chunk_score(chunk, score):
+    """Store a chunk score in the LRU cache, evicting the oldest entry when full."""
+    _CHUNK_SCORE_CACHE[chunk] = score
+    _CHUNK_SCORE_CACHE.move_to_end(chunk)
+    if len(_CHUNK_SCORE_CACHE) > CHUNK_SCORE_CACHE_SIZE:
+        _CHUNK_SCORE_CACHE.popitem(last=False)
+
+
+class _ChunkTimeout(Exception):
+    """Raised when scoring a chunk in-process runs past SENTIMENT_CHUNK_TIMEOUT."""
+
+
+def _raise_chunk_timeout(signum, frame):
+    raise _ChunkTimeout()
+
+
+def _can_time_out_in_process():
+    """Whether an interval timer can interrupt scoring here (Unix, main thread only)."""
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+
+def _score_chunk_with_timeout(chunk):
+    """Score a chunk in this process, raising _ChunkTimeout if it runs too long."""
+    previous = signal.signal(signal.SIGALRM, _raise_chunk_timeout)
+    signal.setitimer(signal.ITIMER_REAL, SENTIMENT_CHUNK_TIMEOUT)
+    try:
+        return _score_chunk(chunk)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _get_sentiment_pool(workers):
+    """Return this process's sentiment pool, creating it on first use."""
+    global _SENTIMENT_POOL, _SENTIMENT_POOL_WORKERS
+    if _SENTIMENT_POOL is None or _SENTIMENT_POOL_WORKERS != workers:
+        _discard_sentiment_pool()
+        _SENTIMENT_POOL = multiprocessing.Pool(workers, initializer=get_sentiment_analyzer)
+        _SENTIMENT_POOL_WORKERS = workers
+    return _SENTIMENT_POOL
+
+
+def _discard_sentiment_pool():
+    """Terminate this process's sentiment pool, killing any stuck worker."""
+    global _SENTIMENT_POOL
+    if _SENTIMENT_POOL is not None:
+        _SENTIMENT_POOL.terminate()
+        _SENTIMENT_POOL = None
+
+
+def _score_chunks(chunks, workers):
+    """
+    Score chunks, skipping any chunk that times out.
+
+    With one worker, chunks are scored in this process and an interval timer
+    abandons a chunk that hangs VADER. Otherwise (or where no timer is
+    available) they go through the process's reused pool. Chunks already in
+    the cache are not scored again.
+    """
+    scores = []
+    remaining = []
+    for i, chunk in enumerate(chunks):
+        if chunk in _CHUNK_SCORE_CACHE:
+            _CHUNK_SCORE_CACHE.move_to_end(chunk)
+            scores.append(_CHUNK_SCORE_CACHE[chunk])
+        else:
+            remaining.append((i, chunk))
+
+    if workers == 1 and _can_time_out_in_process():
+        for i, chunk in remaining:
+            try:
+                score = _score_chunk_with_timeout(chunk)
+            except _ChunkTimeout:
+                print(f"  Warning: sentiment chunk {i + 1}/{len(chunks)} timed out, skipping")
+                continue
+            _remember_chunk_score(chunk, score)
+            scores.append(score)
+        return scores
+
+    while remaining:
+        pool = _get_sentiment_pool(workers)
+        pending = [(i, pool.apply_async(_score_chunk, (chunk,))) for i, chunk in remaining]
+        remaining = []
+        for position, (i, result) in enumerate(pending):
+            try:
+                score = result.get(timeout=SENTIMENT_CHUNK_TIMEOUT)
+                _remember_chunk_score(chunks[i], score)
+                scores.append(score)
+            except multiprocessing.TimeoutError:
+                print(f"  Warning: sentiment chunk {i + 1}/{len(chunks)} timed out, skipping")
+                # The stuck worker blocks everything queued behind it, so
+                # replace the pool and resubmit the uncollected chunks
+                _discard_sentiment_pool()
+                remaining = [(j, chunks[j]) for j, _ in pending[position + 1:]]
+                break
+
+    return scores
+
+
+def _split_long_sentence(sentence, max_chunk_size):
+    """Hard-split a sentence longer than max_chunk_size, preferring whitespace."""
+    pieces = []
+    while len(sentence) > max_chunk_size:
+        cut = sentence.rfind(' ', 0, max_chunk_size)
+        if cut <= 0:
+            cut = max_chunk_size
+        pieces.append(sentence[:cut])
+        sentence = sentence[cut:].lstrip()
+    pieces.append(sentence)
+    return pieces
+
+
+def _chunk_sentences(sentences, max_chunk_size):
+    """Group consecutive sentences into chunks of at most max_chunk_size characters."""
+    chunks = []
+    current = []
+    current_size = 0
+
+    for sentence in sentences:
+        if len(sentence) > max_chunk_size:
+            # A run-on sentence becomes several chunks of its own
+            if current:
+                chunks.append(" ".join(current))
+                current = []
+                current_size = 0
+            chunks.extend(_split_long_sentence(sentence, max_chunk_size))
+            continue
+        if current and current_size + len(sentence) > max_chunk_size:
+            chunks.append(" ".join(current))
+            current = []
+            current_size = 0
+        current.append(sentence)
+        current_size += len(sentence) + 1
+
+    if current:
+        chunks.append(" ".join(current))
+
+    return chunks
+
+
+def analyze_sentiment(sentences, workers=1):
     """
     Perform sentiment analysis using VADER.
 
     Args:
-        text: Input text
+        sentences: List of sentences
+        workers: Number of processes used to score chunks in parallel
 
     Returns:
-        Dictionary with sentiment scores
+        Dictionary with sentiment scores and how many chunks were scored. If
+        every chunk timed out the scores are a neutral placeholder and
+        scored_chunks is 0.
     """
-    analyzer = SentimentIntensityAnalyzer()
-
     # Get overall sentiment for the entire text
-    # For very long texts, we'll analyze in chunks and average
-    max_chunk_size = 10000
-    if len(text) > max_chunk_size:
-        # Split into chunks
-        chunks = [text[i:i+max_chunk_size] for i in range(0, len(text), max_chunk_size)]
-        scores = [analyzer.polarity_scores(chunk) for chunk in chunks]
-
-        # Average the scores
-        avg_scores = {
-            'compound': statistics.mean(s['compound'] for s in scores),
-            'pos': statistics.mean(s['pos'] for s in scores),
-            'neu': statistics.mean(s['neu'] for s in scores),
-            'neg': statistics.mean(s['neg'] for s in scores)
-        }
-    else:
-        avg_scores = analyzer.polarity_scores(text)
+    # For very long texts, we'll analyze in chunks and average. Chunks end on
+    # sentence boundaries where possible, and never exceed max_chunk_size
+    # because VADER's cost grows superlinearly with chunk length.
+    max_chunk_size = 5000
+    chunks = _chunk_sentences(sentences, max_chunk_size) or [""]
+    scores = _score_chunks(chunks, max(1, workers))
+    scored_chunks = len(scores)
+
+    if not scores:
+        # Nothing was measured; fall back to VADER's neutral score, flagged
+        # through scored_chunks rather than passed off as a measurement
+        scores = [{'compound': 0.0, 'pos': 0.0, 'neu': 1.0, 'neg': 0.0}]
+
+    # Average the scores
+    avg_scores = {
+        'compound': statistics.mean(s['compound'] for s in scores),
+        'pos': statistics.mean(s['pos'] for s in scores),
+        'neu': statistics.mean(s['neu'] for s in scores),
+        'neg': statistics.mean(s['neg'] for s in scores)
+    }
 
     return {
         "vader": {
@@ -97,73 +317,55 @@ def analyze_sentiment(text):
             "positive": round(avg_scores['pos'], 4),
             "negative": round(avg_scores['neg'], 4),
             "neutral": round(avg_scores['neu'], 4)
-        }
+        },
+        "scored_chunks": scored_chunks,
+        "total_chunks": len(chunks)
     }
 
 
-def analyze_sentences(text):
+def analyze_sentences(sentence_word_counts):
     """
     Analyze sentence-level statistics.
 
     Args:
-        text: Input text
+        sentence_word_counts: Number of words in each sentence
 
     Returns:
         Dictionary with sentence statistics
     """
-    sentences = sent_tokenize(text)
-    sentence_lengths = [len(word_tokenize(sent)) for sent in sentences]
-
-    # Calculate distribution bins
-    bins = {
-        "0-10": 0,
-        "11-20": 0,
-        "21-30": 0,
-        "31-40": 0,
-        "41-50": 0,
-        "51+": 0
-    }
+    lengths = np.fromiter(sentence_word_counts, dtype=np.int32, count=len(sentence_word_counts))
 
-    for length in sentence_lengths:
-        if length <= 10:
-            bins["0-10"] += 1
-        elif length <= 20:
-            bins["11-20"] += 1
-        elif length <= 30:
-            bins["21-30"] += 1
-        elif length <= 40:
-            bins["31-40"] += 1
-        elif length <= 50:
-            bins["41-50"] += 1
-        else:
-            bins["51+"] += 1
+    # Sentences without words (e.g. section numbers like "2.") are not sentences
+    lengths = lengths[lengths > 0]
+
+    # Calculate distribution bins in one vectorized pass
+    bin_labels = ["0-10", "11-20", "21-30", "31-40", "41-50", "51+"]
+    bin_counts = np.bincount(np.digitize(lengths, [11, 21, 31, 41, 51]), minlength=len(bin_labels))
+    bins = dict(zip(bin_labels, bin_counts.tolist()))
 
     return {
-        "count": len(sentences),
-        "avg_length": round(statistics.mean(sentence_lengths), 2) if sentence_lengths else 0,
-        "median_length": round(statistics.median(sentence_lengths), 2) if sentence_lengths else 0,
-        "std_dev": round(statistics.stdev(sentence_lengths), 2) if len(sentence_lengths) > 1 else 0,
-        "min_length": min(sentence_lengths) if sentence_lengths else 0,
-        "max_length": max(sentence_lengths) if sentence_lengths else 0,
+        "count": int(lengths.size),
+        "avg_length": round(float(lengths.mean()), 2) if lengths.size else 0,
+        "median_length": round(float(np.median(lengths)), 2) if lengths.size else 0,
+        "std_dev": round(float(lengths.std(ddof=1)), 2) if lengths.size > 1 else 0,
+        "min_length": int(lengths.min()) if lengths.size else 0,
+        "max_length": int(lengths.max()) if lengths.size else 0,
         "distribution": bins
     }
 
 
-def analyze_vocabulary(text):
+def analyze_vocabulary(word_ids):
     """
     Analyze vocabulary richness.
 
     Args:
-        text: Input text
+        word_ids: Integer id of every word token (see preprocess.encode_words)
 
     Returns:
         Dictionary with vocabulary metrics
     """
-    words = word_tokenize(text.lower())
-    words = [w for w in words if w.isalpha()]
-
-    total_words = len(words)
-    unique_words = len(set(words))
+    total_words = int(word_ids.size)
+    unique_words = int(np.unique(word_ids).size)
 
     # Type-Token Ratio (TTR)
     ttr = unique_words / total_words if total_words > 0 else 0
@@ -179,78 +381,128 @@ def analyze_vocabulary(text):
     }
 
 
-def analyze_readability(text):
+@lru_cache(maxsize=None)
+def _hyphenator():
+    """Return the English pyphen dictionary, loaded once per process."""
+    return pyphen.Pyphen(lang='en_US')
+
+
+@lru_cache(maxsize=100_000)
+def count_syllables(word):
+    """Estimate the syllables in a word from its hyphenation points."""
+    return len(_hyphenator().positions(word)) + 1
+
+
+def _readability_base(words_alpha, sentence_word_counts):
+    """
+    Count the base measures shared by all readability formulas.
+
+    Returns:
+        Tuple of (words, sentences, syllables, complex words), where complex
+        words have three or more syllables
+    """
+    num_syllables = 0
+    num_complex = 0
+
+    # Syllables are counted once per distinct word and weighted by frequency
+    for word, count in Counter(words_alpha).items():
+        syllables = count_syllables(word)
+        num_syllables += syllables * count
+        if syllables >= 3:
+            num_complex += count
+
+    # Sentences without words (e.g. section numbers like "2.") are not counted
+    num_sentences = sum(1 for count in sentence_word_counts if count)
+
+    return len(words_alpha), num_sentences, num_syllables, num_complex
+
+
+def analyze_readability(words_alpha, sentence_word_counts):
     """
     Calculate readability scores.
 
     Args:
-        text: Input text
+        words_alpha: Lowercased alphabetic word tokens
+        sentence_word_counts: Number of words in each sentence
 
     Returns:
         Dictionary with readability metrics
     """
+    num_words, num_sentences, num_syllables, num_complex = _readability_base(words_alpha, sentence_word_counts)
+
+    if num_words == 0 or num_sentences == 0:
+        return {"flesch_reading_ease": 0, "flesch_kincaid_grade": 0, "gunning_fog": 0}
+
+    words_per_sentence = num_words / num_sentences
+    syllables_per_word = num_syllables / num_words
+
     return {
-        "flesch_reading_ease": round(textstat.flesch_reading_ease(text), 2),
-        "flesch_kincaid_grade": round(textstat.flesch_kincaid_grade(text), 2),
-        "gunning_fog": round(textstat.gunning_fog(text), 2)
+        "flesch_reading_ease": round(206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word, 2),
+        "flesch_kincaid_grade": round(0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59, 2),
+        "gunning_fog": round(0.4 * (words_per_sentence + 100 * num_complex / num_words), 2)
     }
 
 
-def analyze_word_length(text):
+def analyze_word_length(words_alpha):
     """
     Analyze word length distribution.
 
     Args:
-        text: Input text
+        words_alpha: Lowercased alphabetic word tokens
 
     Returns:
         Dictionary with word length metrics
     """
-    words = word_tokenize(text.lower())
-    words = [w for w in words if w.isalpha()]
-
-    word_lengths = [len(w) for w in words]
+    word_lengths = np.fromiter(map(len, words_alpha), dtype=np.int32, count=len(words_alpha))
 
-    # Distribution bins
+    # Distribution bins from a single histogram of lengths (10+ share a bucket)
+    length_counts = np.bincount(np.minimum(word_lengths, 10), minlength=11)
     distribution = {
-        "1-3": sum(1 for l in word_lengths if 1 <= l <= 3),
-        "4-6": sum(1 for l in word_lengths if 4 <= l <= 6),
-        "7-9": sum(1 for l in word_lengths if 7 <= l <= 9),
-        "10+": sum(1 for l in word_lengths if l >= 10)
+        "1-3": int(length_counts[1:4].sum()),
+        "4-6": int(length_counts[4:7].sum()),
+        "7-9": int(length_counts[7:10].sum()),
+        "10+": int(length_counts[10])
     }
 
     return {
-        "average": round(statistics.mean(word_lengths), 2) if word_lengths else 0,
+        "average": round(float(word_lengths.mean()), 2) if word_lengths.size else 0,
         "distribution": distribution
     }
 
 
-def analyze_punctuation(text):
+def analyze_punctuation(text, word_count):
     """
     Analyze punctuation patterns.
 
     Args:
         text: Input text
+        word_count: Number of alphabetic words in the text
 
     Returns:
         Dictionary with punctuation counts and density
     """
-    # Count specific punctuation marks
+    # Histogram every byte in one pass. ASCII bytes never occur inside
+    # multi-byte UTF-8 sequences, so ASCII byte counts equal character counts.
+    byte_counts = np.bincount(np.frombuffer(text.encode('utf-8'), dtype=np.uint8), minlength=256)
+
+    def count(ch):
+        return int(byte_counts[ord(ch)])
+
+    # Count specific punctuation marks; the em dash is non-ASCII and '--' is
+    # two characters, so those still need their own scans
     punctuation_counts = {
-        "period": text.count('.'),
-        "exclamation": text.count('!'),
-        "question": text.count('?'),
-        "semicolon": text.count(';'),
-        "colon": text.count(':'),
-        "comma": text.count(','),
+        "period": count('.'),
+        "exclamation": count('!'),
+        "question": count('?'),
+        "semicolon": count(';'),
+        "colon": count(':'),
+        "comma": count(','),
         "dash": text.count('—') + text.count('--'),
-        "parentheses": text.count('(') + text.count(')'),
-        "quotes": text.count('"') + text.count("'")
+        "parentheses": count('(') + count(')'),
+        "quotes": count('"') + count("'")
     }
 
     # Calculate density (per 1000 words)
-    words = word_tokenize(text)
-    word_count = len([w for w in words if w.isalpha()])
     total_punctuation = sum(punctuation_counts.values())
 
     density = (total_punctuation / word_count * 1000) if word_count > 0 else 0
@@ -261,38 +513,74 @@ def analyze_punctuation(text):
     }
 
 
-def extract_ngrams(text, n=2, top_k=30):
+def extract_ngrams(words_alpha, stop_words, n=2, top_k=30):
     """
     Extract n-grams from text.
 
     Args:
-        text: Input text
+        words_alpha: Lowercased alphabetic word tokens
+        stop_words: Set of stopwords used to filter n-grams
         n: N-gram size (2 for bigrams, 3 for trigrams)
         top_k: Number of top n-grams to return
 
     Returns:
         List of n-grams with frequencies
     """
-    words = word_tokenize(text.lower())
-
-    # Remove stopwords and punctuation
-    stop_words = set(stopwords.words('english'))
-    words = [w for w in words if w.isalpha() and len(w) > 2]
-
-    # Generate n-grams
-    ngram_list = list(nltk_ngrams(words, n))
+    # Remove short words
+    words = [w for w in words_alpha if len(w) > 2]
+    num_windows = len(words) - n + 1
+    if num_windows <= 0:
+        return []
+
+    # Map each word to an integer id so n-grams can be counted as packed
+    # int64 keys instead of Python tuples
+    word_ids = {}
+    ids = np.fromiter(
+        (word_ids.setdefault(w, len(word_ids)) for w in words),
+        dtype=np.int64,
+        count=len(words)
+    )
+    vocab = list(word_ids)
+    vocab_size = len(vocab)
+
+    if vocab_size ** n >= 2 ** 63:
+        # Packed keys would overflow int64; fall back to counting tuples
+        ngram_freq = Counter(
+            ng for ng in zip(*(words[i:] for i in range(n)))
+            if not all(w in stop_words for w in ng)
+        )
+        return [
+            {"phrase": " ".join(ngram), "count": count}
+            for ngram, count in ngram_freq.most_common(top_k)
+        ]
+
+    is_stop = np.fromiter((w in stop_words for w in vocab), dtype=bool, count=vocab_size)
+    stop_mask = is_stop[ids]
+
+    # Slide an n-word window over the ids, packing each window into one key
+    keys = np.zeros(num_windows, dtype=np.int64)
+    all_stop = np.ones(num_windows, dtype=bool)
+    for i in range(n):
+        keys = keys * vocab_size + ids[i:i + num_windows]
+        all_stop &= stop_mask[i:i + num_windows]
 
     # Filter out n-grams that are all stopwords
-    ngram_list = [ng for ng in ngram_list if not all(w in stop_words for w in ng)]
-
-    # Count frequencies
-    ngram_freq = Counter(ngram_list)
-
-    # Convert to list of dictionaries
-    top_ngrams = [
-        {"phrase": " ".join(ngram), "count": count}
-        for ngram, count in ngram_freq.most_common(top_k)
-    ]
+    keys = keys[~all_stop]
+    if keys.size == 0:
+        return []
+
+    # Count frequencies; ties keep first-occurrence order like Counter.most_common
+    unique_keys, first_seen, counts = np.unique(keys, return_index=True, return_counts=True)
+    top = np.lexsort((first_seen, -counts))[:top_k]
+
+    # Unpack keys back into words and convert to list of dictionaries
+    top_ngrams = []
+    for key, count in zip(unique_keys[top].tolist(), counts[top].tolist()):
+        ngram = []
+        for _ in range(n):
+            key, word_id = divmod(key, vocab_size)
+            ngram.append(vocab[word_id])
+        top_ngrams.append({"phrase": " ".join(reversed(ngram)), "count": count})
 
     return top_ngrams
 
@@ -307,40 +595,23 @@ def extract_key_concepts(text):
     Returns:
         List of concepts with counts
     """
-    # Define key Nietzschean concepts with variations
-    concepts = {
-        "will to power": [r'\bwill[- ]to[- ]power\b', r'\bwill-to-power\b'],
-        "übermensch": [r'\b[uü]bermensch\b', r'\boverman\b', r'\bsuperman\b'],
-        "eternal recurrence": [r'\beternal\s+recurrence\b', r'\beternal\s+return\b'],
-        "master morality": [r'\bmaster\s+morality\b', r'\bmaster-morality\b'],
-        "slave morality": [r'\bslave\s+morality\b', r'\bslave-morality\b'],
-        "ressentiment": [r'\bressentiment\b', r'\bresentment\b'],
-        "nihilism": [r'\bnihilism\b', r'\bnihilist\b'],
-        "genealogy": [r'\bgenealogy\b', r'\bgeneaological\b'],
-        "perspectivism": [r'\bperspectiv\w*\b'],
-        "dionysian": [r'\bdionysian\b', r'\bdionysos\b'],
-        "apollonian": [r'\bapollonian\b', r'\bapollo\b'],
-        "god is dead": [r'\bgod\s+is\s+dead\b'],
-        "amor fati": [r'\bamor\s+fati\b']
-    }
-
-    results = []
+    counts = Counter()
+    variants = {concept: {} for concept in KEY_CONCEPTS}
 
-    for concept, patterns in concepts.items():
-        total_count = 0
-        variants_found = []
+    # Single scan over the text; the matching group identifies the concept
+    for match in _CONCEPT_RE.finditer(text):
+        concept = _GROUP_TO_CONCEPT[match.lastgroup]
+        counts[concept] += 1
+        variants[concept].setdefault(match.group(), None)
 
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                total_count += len(matches)
-                variants_found.extend(set(matches))
+    results = []
 
-        if total_count > 0:
+    for concept in KEY_CONCEPTS:
+        if counts[concept] > 0:
             results.append({
                 "term": concept,
-                "count": total_count,
-                "variants": list(set(variants_found))[:5]  # Top 5 variants
+                "count": counts[concept],
+                "variants": list(variants[concept])[:5]  # First 5 variants seen
             })
 
     # Sort by count
@@ -349,7 +620,7 @@ def extract_key_concepts(text):
     return results
 
 
-def analyze_text(text_id, text_content, metadata):
+def analyze_text(text_id, text_content, metadata, sentiment_workers=1, tokens=None):
     """
     Perform comprehensive analysis on a single text.
 
@@ -357,32 +628,48 @@ def analyze_text(text_id, text_content, metadata):
         text_id: Unique identifier for the text
         text_content: The text content to analyze
         metadata: Text metadata (title, filename, etc.)
+        sentiment_workers: Number of processes used for sentiment scoring
+        tokens: Precomputed tokens from preprocess_text; computed here if omitted.
+            Word ids are assigned from a vocabulary of this text alone if the
+            tokens don't carry shared-vocabulary ids already.
 
     Returns:
         Complete analysis dictionary
     """
     print(f"\nAnalyzing: {metadata['title']}")
 
+    # Tokenize once (or reuse the preprocessing tokens) and share the tokens
+    # across all analyzers
+    if tokens is None:
+        print("  - Tokenizing...")
+        tokens = tokenize_text(text_content)
+    if 'word_ids' not in tokens:
+        tokens['word_ids'] = encode_words(tokens['words'], {})
+    sentences = tokens['sentences']
+    sentence_word_counts = tokens['sentence_word_counts']
+    words_alpha = tokens['words']
+    stop_words = get_stop_words()
+
     # Bag of words
     print("  - Bag of words...")
-    bow = analyze_bag_of_words(text_content)
+    bow = analyze_bag_of_words(words_alpha, stop_words)
 
     # Sentiment analysis
     print("  - Sentiment analysis...")
-    sentiment = analyze_sentiment(text_content)
+    sentiment = analyze_sentiment(sentences, workers=sentiment_workers)
 
     # Style metrics
     print("  - Style metrics...")
-    sentences = analyze_sentences(text_content)
-    vocabulary = analyze_vocabulary(text_content)
-    readability = analyze_readability(text_content)
-    word_length = analyze_word_length(text_content)
-    punctuation = analyze_punctuation(text_content)
+    sentence_stats = analyze_sentences(sentence_word_counts)
+    vocabulary = analyze_vocabulary(tokens['word_ids'])
+    readability = analyze_readability(words_alpha, sentence_word_counts)
+    word_length = analyze_word_length(words_alpha)
+    punctuation = analyze_punctuation(text_content, len(words_alpha))
 
     # N-grams
     print("  - N-grams...")
-    bigrams = extract_ngrams(text_content, n=2, top_k=30)
-    trigrams = extract_ngrams(text_content, n=3, top_k=30)
+    bigrams = extract_ngrams(words_alpha, stop_words, n=2, top_k=30)
+    trigrams = extract_ngrams(words_alpha, stop_words, n=3, top_k=30)
 
     # Key concepts
     print("  - Key concepts...")
@@ -397,7 +684,7 @@ def analyze_text(text_id, text_content, metadata):
         "bag_of_words": bow,
         "sentiment": sentiment,
         "style_metrics": {
-            "sentences": sentences,
+            "sentences": sentence_stats,
             "vocabulary": vocabulary,
             "readability": readability,
             "word_length": word_length,
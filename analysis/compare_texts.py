@@ -3,45 +3,25 @@ Comparative analysis module for Nietzsche corpus.
 Computes vocabulary overlap, similarities, and comparative metrics.
 """
 
-import statistics
-from nltk.tokenize import word_tokenize
+import numpy as np
 
 
-def calculate_vocabulary_overlap(text1_content, text2_content, text1_id, text2_id):
-    """
-    Calculate vocabulary overlap between two texts.
-
-    Args:
-        text1_content: Content of first text
-        text2_content: Content of second text
-        text1_id: ID of first text
-        text2_id: ID of second text
-
-    Returns:
-        Dictionary with overlap metrics
-    """
-    # Tokenize and get unique words
-    words1 = set(w.lower() for w in word_tokenize(text1_content) if w.isalpha())
-    words2 = set(w.lower() for w in word_tokenize(text2_content) if w.isalpha())
-
-    # Calculate overlap
-    shared = words1 & words2
-    unique_to_1 = words1 - words2
-    unique_to_2 = words2 - words1
+def _overlap_metrics(text1_id, text2_id, shared, size1, size2):
+    """Build the overlap record for a pair from shared and per-text vocabulary sizes."""
+    union = size1 + size2 - shared
 
     # Jaccard similarity: |intersection| / |union|
-    union = words1 | words2
-    jaccard = len(shared) / len(union) if union else 0
+    jaccard = shared / union if union else 0
 
     return {
         "text1": text1_id,
         "text2": text2_id,
-        "shared_words": len(shared),
-        "unique_to_text1": len(unique_to_1),
-        "unique_to_text2": len(unique_to_2),
+        "shared_words": shared,
+        "unique_to_text1": size1 - shared,
+        "unique_to_text2": size2 - shared,
         "jaccard_similarity": round(jaccard, 4),
-        "overlap_percentage_text1": round(len(shared) / len(words1) * 100, 2) if words1 else 0,
-        "overlap_percentage_text2": round(len(shared) / len(words2) * 100, 2) if words2 else 0
+        "overlap_percentage_text1": round(shared / size1 * 100, 2) if size1 else 0,
+        "overlap_percentage_text2": round(shared / size2 * 100, 2) if size2 else 0
     }
 
 
@@ -50,7 +30,9 @@ def compare_all_texts(texts_data):
     Perform pairwise comparisons of all texts.
 
     Args:
-        texts_data: Dictionary with text IDs as keys and content/metadata as values
+        texts_data: Dictionary with text IDs as keys and content/metadata/tokens
+            as values, as built by run_analysis. Each text's tokens carry word
+            ids drawn from one vocabulary shared by all texts.
 
     Returns:
         Dictionary with comparative analysis results
@@ -61,6 +43,17 @@ def compare_all_texts(texts_data):
     pairs = []
     matrix = {}
 
+    # Word ids from preprocessing share one vocabulary, so they index the
+    # columns of a text-by-word incidence matrix directly. Its Gram matrix
+    # holds every pairwise intersection size, with vocabulary sizes on the
+    # diagonal.
+    rows = [texts_data[text_id]['tokens']['word_ids'] for text_id in text_ids]
+    vocab_size = max((int(row.max()) + 1 for row in rows if row.size), default=0)
+    presence = np.zeros((len(text_ids), vocab_size), dtype=np.int32)
+    for i, row in enumerate(rows):
+        presence[i, row] = 1
+    shared_counts = (presence @ presence.T).tolist()
+
     # Initialize similarity matrix
     for text_id in text_ids:
         matrix[text_id] = {}
@@ -75,15 +68,17 @@ def compare_all_texts(texts_data):
     current = 0
 
     for i, text1_id in enumerate(text_ids):
-        for text2_id in text_ids[i+1:]:
+        for j in range(i + 1, len(text_ids)):
+            text2_id = text_ids[j]
             current += 1
             print(f"  Comparing pair {current}/{total_pairs}: {text1_id} vs {text2_id}")
 
-            overlap = calculate_vocabulary_overlap(
-                texts_data[text1_id]['content'],
-                texts_data[text2_id]['content'],
+            overlap = _overlap_metrics(
                 text1_id,
-                text2_id
+                text2_id,
+                shared_counts[i][j],
+                shared_counts[i][i],
+                shared_counts[j][j]
             )
 
             pairs.append(overlap)
@@ -99,6 +94,16 @@ def compare_all_texts(texts_data):
     }
 
 
+def _summarize(values, digits):
+    """Mean, sample standard deviation, min and max of a metric column."""
+    return {
+        "mean": round(float(values.mean()), digits),
+        "std_dev": round(float(values.std(ddof=1)), digits) if values.size > 1 else 0,
+        "min": round(float(values.min()), digits),
+        "max": round(float(values.max()), digits)
+    }
+
+
 def compare_sentiments(analyses):
     """
     Create sentiment comparison summary.
@@ -109,30 +114,34 @@ def compare_sentiments(analyses):
     Returns:
         Dictionary with sentiment comparison metrics
     """
-    compounds = [a['sentiment']['vader']['compound'] for a in analyses]
-    positives = [a['sentiment']['vader']['positive'] for a in analyses]
-    negatives = [a['sentiment']['vader']['negative'] for a in analyses]
-    neutrals = [a['sentiment']['vader']['neutral'] for a in analyses]
+    # One row per text, one column per VADER score
+    fields = ['compound', 'positive', 'negative', 'neutral']
+    scores = np.array(
+        [[a['sentiment']['vader'][field] for field in fields] for a in analyses],
+        dtype=np.float64
+    )
+    compounds = scores[:, 0]
+    compound = _summarize(compounds, 4)
+    positive = _summarize(scores[:, 1], 4)
+    negative = _summarize(scores[:, 2], 4)
+    neutral = _summarize(scores[:, 3], 4)
 
     return {
         "compound": {
-            "mean": round(statistics.mean(compounds), 4),
-            "std_dev": round(statistics.stdev(compounds), 4) if len(compounds) > 1 else 0,
-            "min": round(min(compounds), 4),
-            "max": round(max(compounds), 4),
-            "range": round(max(compounds) - min(compounds), 4)
+            **compound,
+            "range": round(float(compounds.max() - compounds.min()), 4)
         },
         "positive": {
-            "mean": round(statistics.mean(positives), 4),
-            "std_dev": round(statistics.stdev(positives), 4) if len(positives) > 1 else 0
+            "mean": positive["mean"],
+            "std_dev": positive["std_dev"]
         },
         "negative": {
-            "mean": round(statistics.mean(negatives), 4),
-            "std_dev": round(statistics.stdev(negatives), 4) if len(negatives) > 1 else 0
+            "mean": negative["mean"],
+            "std_dev": negative["std_dev"]
         },
         "neutral": {
-            "mean": round(statistics.mean(neutrals), 4),
-            "std_dev": round(statistics.stdev(neutrals), 4) if len(neutrals) > 1 else 0
+            "mean": neutral["mean"],
+            "std_dev": neutral["std_dev"]
         }
     }
 
@@ -147,46 +156,33 @@ def compare_style_metrics(analyses):
     Returns:
         Dictionary with style comparison metrics
     """
-    # Sentence length
-    avg_sentence_lengths = [a['style_metrics']['sentences']['avg_length'] for a in analyses]
-
-    # Vocabulary richness
-    ttrs = [a['style_metrics']['vocabulary']['type_token_ratio'] for a in analyses]
-
-    # Readability
-    flesch_scores = [a['style_metrics']['readability']['flesch_reading_ease'] for a in analyses]
-    fk_grades = [a['style_metrics']['readability']['flesch_kincaid_grade'] for a in analyses]
-
-    # Word length
-    avg_word_lengths = [a['style_metrics']['word_length']['average'] for a in analyses]
-
-    return {
-        "sentence_length": {
-            "mean": round(statistics.mean(avg_sentence_lengths), 2),
-            "std_dev": round(statistics.stdev(avg_sentence_lengths), 2) if len(avg_sentence_lengths) > 1 else 0,
-            "range": [round(min(avg_sentence_lengths), 2), round(max(avg_sentence_lengths), 2)]
-        },
-        "type_token_ratio": {
-            "mean": round(statistics.mean(ttrs), 4),
-            "std_dev": round(statistics.stdev(ttrs), 4) if len(ttrs) > 1 else 0,
-            "range": [round(min(ttrs), 4), round(max(ttrs), 4)]
-        },
-        "flesch_reading_ease": {
-            "mean": round(statistics.mean(flesch_scores), 2),
-            "std_dev": round(statistics.stdev(flesch_scores), 2) if len(flesch_scores) > 1 else 0,
-            "range": [round(min(flesch_scores), 2), round(max(flesch_scores), 2)]
-        },
-        "flesch_kincaid_grade": {
-            "mean": round(statistics.mean(fk_grades), 2),
-            "std_dev": round(statistics.stdev(fk_grades), 2) if len(fk_grades) > 1 else 0,
-            "range": [round(min(fk_grades), 2), round(max(fk_grades), 2)]
-        },
-        "avg_word_length": {
-            "mean": round(statistics.mean(avg_word_lengths), 2),
-            "std_dev": round(statistics.stdev(avg_word_lengths), 2) if len(avg_word_lengths) > 1 else 0,
-            "range": [round(min(avg_word_lengths), 2), round(max(avg_word_lengths), 2)]
-        }
+    # Extract every compared metric in a single pass: one row per text,
+    # one column per metric
+    columns = {
+        "sentence_length": (('sentences', 'avg_length'), 2),
+        "type_token_ratio": (('vocabulary', 'type_token_ratio'), 4),
+        "flesch_reading_ease": (('readability', 'flesch_reading_ease'), 2),
+        "flesch_kincaid_grade": (('readability', 'flesch_kincaid_grade'), 2),
+        "avg_word_length": (('word_length', 'average'), 2)
     }
+    metrics = np.array(
+        [
+            [a['style_metrics'][group][field] for (group, field), _ in columns.values()]
+            for a in analyses
+        ],
+        dtype=np.float64
+    )
+
+    summary = {}
+    for i, (name, (_, digits)) in enumerate(columns.items()):
+        stats = _summarize(metrics[:, i], digits)
+        summary[name] = {
+            "mean": stats["mean"],
+            "std_dev": stats["std_dev"],
+            "range": [stats["min"], stats["max"]]
+        }
+
+    return summary
 
 
 if __name__ == '__main__':
@@ -3,10 +3,37 @@ Text preprocessing module for Nietzsche corpus.
 Extracts clean philosophical text from Project Gutenberg files.
 """
 
+import mmap
 import re
 import os
 from pathlib import Path
 
+import numpy as np
+from nltk.tokenize import sent_tokenize
+
+
+# Runs of Unicode letters. Apostrophes, hyphens and digits break a run, so
+# contractions and hyphenated compounds split into their component words
+_WORD_RE = re.compile(r'[^\W\d_]+')
+
+# Literal forms of the Project Gutenberg markers, located with plain find()
+_START_MARKERS = ('*** START OF THE PROJECT GUTENBERG EBOOK', '*** START OF THIS PROJECT GUTENBERG EBOOK')
+_END_MARKERS = ('*** END OF THE PROJECT GUTENBERG EBOOK', '*** END OF THIS PROJECT GUTENBERG EBOOK')
+
+# Fallback: START and END markers in one case-insensitive pattern, for text and raw bytes
+_MARKER_PATTERN = r'\*\*\* (?:(?P<start>START)|END) OF (?:THE|THIS) PROJECT GUTENBERG EBOOK[^\*]*\*\*\*'
+_MARKER_RE = re.compile(_MARKER_PATTERN, re.IGNORECASE)
+_MARKER_BYTES_RE = re.compile(_MARKER_PATTERN.encode('ascii'), re.IGNORECASE)
+
+# All cleanup rules as one alternation so the text is rewritten in a single pass:
+# page numbers on their own line, runs of blank lines, and runs of spaces/tabs
+# (a lone space is left alone so it doesn't need a replacement call)
+_CLEAN_RE = re.compile(r'(?P<page>\n\s*\d+\s*\n)|(?P<breaks>\n{3,})|(?P<spaces> [ \t]+|\t[ \t]*)')
+_CLEAN_REPLACEMENTS = {'page': '\n', 'breaks': '\n\n', 'spaces': ' '}
+
+# Files larger than this are memory-mapped rather than read into memory whole
+MMAP_THRESHOLD = 1024 * 1024
+
 
 def remove_bom(text):
     """Remove UTF-8 BOM if present."""
@@ -15,21 +42,56 @@ def remove_bom(text):
     return text
 
 
+def _find_marker(buf, markers, begin=0):
+    """Return (start, end) offsets of the earliest literal marker at or after begin, or None."""
+    stars = '***'
+    if not isinstance(buf, str):
+        markers = tuple(marker.encode('ascii') for marker in markers)
+        stars = b'***'
+
+    found = [(buf.find(marker, begin), len(marker)) for marker in markers]
+    found = [hit for hit in found if hit[0] >= 0]
+    if not found:
+        return None
+
+    # Advance past the title to the closing '***'
+    start, length = min(found)
+    close = buf.find(stars, start + length)
+    if close < 0:
+        return None
+    return start, close + len(stars)
+
+
+def _content_span(buf, marker_re):
+    """Return (start, end) offsets of the content between the markers, or None."""
+    # Fast path: the markers almost always appear verbatim in upper case
+    start_marker = _find_marker(buf, _START_MARKERS)
+    if start_marker:
+        end_marker = _find_marker(buf, _END_MARKERS, start_marker[1])
+        if end_marker:
+            return start_marker[1], end_marker[0]
+
+    # Fall back to the case-insensitive regex scan
+    start = None
+    for match in marker_re.finditer(buf):
+        if match.group('start') is not None:
+            if start is None:
+                start = match.end()
+        elif start is not None:
+            return start, match.start()
+    return None
+
+
 def extract_content(text):
     """
     Extract content between Project Gutenberg START and END markers.
     Returns only Nietzsche's philosophical text.
     """
-    # Find the START marker
-    start_pattern = r'\*\*\* START OF (?:THE|THIS) PROJECT GUTENBERG EBOOK[^\*]*\*\*\*'
-    end_pattern = r'\*\*\* END OF (?:THE|THIS) PROJECT GUTENBERG EBOOK[^\*]*\*\*\*'
+    span = _content_span(text, _MARKER_RE)
 
-    start_match = re.search(start_pattern, text, re.IGNORECASE)
-    end_match = re.search(end_pattern, text, re.IGNORECASE)
-
-    if start_match and end_match:
+    if span:
         # Extract content between markers
-        content = text[start_match.end():end_match.start()]
+        content = text[span[0]:span[1]]
         return content.strip()
 
     # If markers not found, return original text (fallback)
@@ -41,16 +103,28 @@ def clean_text(text):
     """
     Clean extracted text while preserving structure.
     """
-    # Remove excessive whitespace while preserving paragraph breaks
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    # Remove page numbers, collapse excessive blank lines while preserving
+    # paragraph breaks, and clean up spacing
+    text = _CLEAN_RE.sub(lambda m: _CLEAN_REPLACEMENTS[m.lastgroup], text)
 
-    # Remove page numbers and other artifacts
-    text = re.sub(r'\n\s*\d+\s*\n', '\n', text)
+    return text.strip()
 
-    # Clean up spacing
-    text = re.sub(r'[ \t]+', ' ', text)
 
-    return text.strip()
+def _decode(data):
+    """Decode UTF-8 bytes with universal newlines, as text-mode open() would."""
+    return data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _decode_content(buf):
+    """Decode the text between the Gutenberg markers of a raw file buffer."""
+    span = _content_span(buf, _MARKER_BYTES_RE)
+
+    if span:
+        return _decode(buf[span[0]:span[1]]).strip()
+
+    # If markers not found, return the whole text (fallback)
+    print("Warning: Could not find Project Gutenberg markers")
+    return remove_bom(_decode(buf[:]))
 
 
 def preprocess_file(filepath):
@@ -63,14 +137,14 @@ def preprocess_file(filepath):
     Returns:
         Cleaned text content
     """
-    with open(filepath, 'r', encoding='utf-8') as f:
-        text = f.read()
-
-    # Remove BOM
-    text = remove_bom(text)
-
-    # Extract content between markers
-    text = extract_content(text)
+    # Locate the markers on the raw bytes and decode only the content between
+    # them; large files are memory-mapped so they are never copied whole
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                text = _decode_content(buf)
+        else:
+            text = _decode_content(f.read())
 
     # Clean the text
     text = clean_text(text)
@@ -78,6 +152,50 @@ def preprocess_file(filepath):
     return text
 
 
+def tokenize_words(text):
+    """Return the lowercased alphabetic words of a text."""
+    return _WORD_RE.findall(text.lower())
+
+
+def tokenize_sentences(text):
+    """Split a text into sentences with NLTK's Punkt model."""
+    return sent_tokenize(text)
+
+
+def count_words(text):
+    """Count the alphabetic words in a text."""
+    return len(_WORD_RE.findall(text))
+
+
+def tokenize_text(text):
+    """
+    Tokenize a text once for every downstream analysis.
+
+    Args:
+        text: Cleaned text content
+
+    Returns:
+        Dictionary with lowercased alphabetic words, sentences and the
+        number of words in each sentence
+    """
+    sentences = tokenize_sentences(text)
+
+    return {
+        'words': tokenize_words(text),
+        'sentences': sentences,
+        'sentence_word_counts': [count_words(sent) for sent in sentences]
+    }
+
+
+def encode_words(words, vocabulary):
+    """Map words to int32 ids, adding unseen words to the shared vocabulary."""
+    return np.fromiter(
+        (vocabulary.setdefault(w, len(vocabulary)) for w in words),
+        dtype=np.int32,
+        count=len(words)
+    )
+
+
 def get_text_metadata(filename):
     """Extract metadata from filename."""
     # Remove 'Nietzsche_' prefix and '.txt' suffix
@@ -93,43 +211,41 @@ def get_text_metadata(filename):
     }
 
 
-def preprocess_all_texts(base_dir='.'):
+def find_text_files(base_dir='.'):
+    """Return the Nietzsche text files in a directory, sorted by filename."""
+    return sorted(Path(base_dir).glob('Nietzsche_*.txt'))
+
+
+def preprocess_text(filepath):
     """
-    Preprocess all Nietzsche text files in the repository.
+    Preprocess and tokenize a single Nietzsche text file.
 
     Args:
-        base_dir: Base directory containing the text files
+        filepath: Path to the text file
 
     Returns:
-        Dictionary mapping text IDs to preprocessed content and metadata
+        Dictionary with metadata, cleaned content and tokens. Word ids are not
+        assigned here since they depend on the vocabulary shared by all texts.
     """
-    base_path = Path(base_dir)
-    texts = {}
-
-    # Find all Nietzsche text files
-    text_files = sorted(base_path.glob('Nietzsche_*.txt'))
+    filepath = Path(filepath)
+    metadata = get_text_metadata(filepath.name)
 
-    print(f"Found {len(text_files)} Nietzsche texts to preprocess...")
-
-    for filepath in text_files:
-        filename = filepath.name
-        metadata = get_text_metadata(filename)
-
-        print(f"Processing: {metadata['title']}...")
+    print(f"Processing: {metadata['title']}...")
 
-        # Preprocess the text
-        clean_content = preprocess_file(filepath)
+    # Preprocess the text
+    clean_content = preprocess_file(filepath)
 
-        # Store with metadata
-        texts[metadata['id']] = {
-            'metadata': metadata,
-            'content': clean_content,
-            'char_count': len(clean_content)
-        }
+    # Tokenize once so analysis and comparison can share the tokens
+    tokens = tokenize_text(clean_content)
 
-        print(f"  Extracted {len(clean_content):,} characters")
+    print(f"  Extracted {len(clean_content):,} characters, {len(tokens['words']):,} words")
 
-    return texts
+    return {
+        'metadata': metadata,
+        'content': clean_content,
+        'char_count': len(clean_content),
+        'tokens': tokens
+    }
 
 
 if __name__ == '__main__':
@@ -139,10 +255,12 @@ if __name__ == '__main__':
     base_dir = sys.argv[1] if len(sys.argv) > 1 else '..'
 
     print("Starting text preprocessing...")
-    texts = preprocess_all_texts(base_dir)
+    text_files = find_text_files(base_dir)
+    print(f"Found {len(text_files)} Nietzsche texts to preprocess...")
+    texts = [preprocess_text(filepath) for filepath in text_files]
 
     print(f"\nPreprocessing complete!")
     print(f"Total texts processed: {len(texts)}")
 
-    for text_id, data in texts.items():
+    for data in texts:
         print(f"  {data['metadata']['title']}: {data['char_count']:,} chars")
@@ -5,12 +5,16 @@ Orchestrates preprocessing, analysis, comparison, and JSON output.
 """
 
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
+import orjson
+
 # Import our modules
-from preprocess import preprocess_all_texts
+from preprocess import find_text_files, get_text_metadata, preprocess_text, encode_words
 from analyze_texts import analyze_text, ensure_nltk_data
 from compare_texts import compare_all_texts, compare_sentiments, compare_style_metrics
 
@@ -30,32 +34,55 @@ def main():
     print("\nSetting up NLTK data...")
     ensure_nltk_data()
 
-    # Step 1: Preprocess all texts
+    # Steps 1-3 run as a pipeline on one process pool: each text is analyzed
+    # as soon as its own preprocessing finishes, and the vocabulary comparison
+    # runs in this process while the analyses are still in flight
     print("\n" + "=" * 60)
-    print("Step 1: Preprocessing texts")
+    print("Steps 1-3: Preprocessing, analyzing and comparing texts")
     print("=" * 60)
-    texts_data = preprocess_all_texts(base_dir)
 
-    # Step 2: Analyze each text
-    print("\n" + "=" * 60)
-    print("Step 2: Analyzing texts")
-    print("=" * 60)
+    text_files = find_text_files(base_dir)
+    text_ids = [get_text_metadata(filepath.name)['id'] for filepath in text_files]
+    print(f"Found {len(text_files)} Nietzsche texts to preprocess...")
 
-    analyses = []
-    for text_id, data in texts_data.items():
-        analysis = analyze_text(
-            text_id,
-            data['content'],
-            data['metadata']
-        )
-        analyses.append(analysis)
+    # One core is left for this process; spare cores go to per-text sentiment scoring
+    cpu_count = os.cpu_count() or 1
+    text_workers = max(1, min(len(text_files), cpu_count - 1))
+    sentiment_workers = max(1, (cpu_count - 1) // text_workers)
 
-    # Step 3: Comparative analysis
-    print("\n" + "=" * 60)
-    print("Step 3: Comparative analysis")
-    print("=" * 60)
+    texts_data = {}
+    vocabulary = {}
+    analysis_futures = {}
+
+    with ProcessPoolExecutor(max_workers=text_workers) as executor:
+        # Step 1: Preprocess all texts
+        preprocess_futures = [executor.submit(preprocess_text, filepath) for filepath in text_files]
+
+        # Step 2: Analyze each text as soon as it has been preprocessed
+        for future in as_completed(preprocess_futures):
+            data = future.result()
+            text_id = data['metadata']['id']
+
+            # Word ids come from one vocabulary shared by all texts, so they
+            # are assigned here rather than in the workers
+            data['tokens']['word_ids'] = encode_words(data['tokens']['words'], vocabulary)
+            texts_data[text_id] = data
+
+            analysis_futures[text_id] = executor.submit(
+                analyze_text,
+                text_id,
+                data['content'],
+                data['metadata'],
+                sentiment_workers,
+                data['tokens']
+            )
+
+        # Step 3: Comparative analysis, in file order for stable output
+        texts_data = {text_id: texts_data[text_id] for text_id in text_ids}
+        vocabulary_comparison = compare_all_texts(texts_data)
+
+        analyses = [analysis_futures[text_id].result() for text_id in text_ids]
 
-    vocabulary_comparison = compare_all_texts(texts_data)
     sentiment_comparison = compare_sentiments(analyses)
     style_comparison = compare_style_metrics(analyses)
 
@@ -79,11 +106,14 @@ def main():
     }
 
     # Step 5: Write to JSON file
+    # The full analysis is large, so it is written compactly with orjson
+    # (UTF-8, no indentation); NumPy values are serialized natively.
     output_path = data_dir / 'nietzsche_analysis.json'
     print(f"\nWriting analysis to: {output_path}")
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    output_path.write_bytes(
+        orjson.dumps(output, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    )
 
     file_size = output_path.stat().st_size / 1024 / 1024  # MB
     print(f"Output file size: {file_size:.2f} MB")